@@ -0,0 +1,570 @@
+"""
+端到端性能基准：文档导入、检索、聊天流式输出、文件树/搜索接口、embedding 后端对比以及多 worker 扩展性
+
+用法示例:
+    python backend/benchmark.py --suites ingest,retrieval --fake-embed --output bench.json
+    python backend/benchmark.py --suites chat --clients 1,8,32
+    python backend/benchmark.py --suites startup --import-budget-ms 1000 --fail-over-budget
+    python backend/benchmark.py --suites embed --embed-model bge-small --embed-backends onnx,onnx-int8
+    python backend/benchmark.py --suites workers --fake-embed --worker-counts 1,2,4
+
+结果以 JSON 输出，附带当前 git commit，便于不同提交之间对比。
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import subprocess
+import datetime
+import socket
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+
+WORDS = (
+    "vector index search query embedding model chunk token stream latency python "
+    "server client request response document source folder file commit branch cache "
+    "检索 向量 文档 模型 分割 缓存 仓库 流式 延迟 吞吐"
+).split()
+
+# === Helpers ===
+def percentiles(samples):
+    """返回 p50/p95/p99/mean (毫秒)"""
+    ms = sorted(s * 1000 for s in samples)
+    if len(ms) < 2:
+        v = ms[0] if ms else 0.0
+        return {"p50": v, "p95": v, "p99": v, "mean": v, "n": len(ms)}
+    q = statistics.quantiles(ms, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98], "mean": statistics.fmean(ms), "n": len(ms)}
+
+def random_text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+def make_folder(root, n_files, words_per_file, rng):
+    """生成包含 n_files 个源码/文档文件的合成项目"""
+    exts = [".py", ".md", ".txt", ".js", ".json"]
+    for i in range(n_files):
+        sub = os.path.join(root, f"pkg_{i % 10}", f"mod_{i % 7}")
+        os.makedirs(sub, exist_ok=True)
+        with open(os.path.join(sub, f"file_{i}{exts[i % len(exts)]}"), "w", encoding="utf-8") as f:
+            f.write(random_text(rng, words_per_file))
+
+def make_tree(root, depth, breadth, files_per_dir, rng):
+    """生成 depth 层、每层 breadth 个子目录的目录树"""
+    for i in range(files_per_dir):
+        with open(os.path.join(root, f"f_{i}.py"), "w", encoding="utf-8") as f:
+            f.write(random_text(rng, 200))
+    if depth > 0:
+        for b in range(breadth):
+            sub = os.path.join(root, f"d_{b}")
+            os.makedirs(sub, exist_ok=True)
+            make_tree(sub, depth - 1, breadth, files_per_dir, rng)
+
+def use_fake_embeddings(server, size):
+    """替换为确定性哈希向量，仅测量流水线本身的开销"""
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    server.get_embedding_model = lambda model_name: DeterministicFakeEmbedding(size=size)
+
+def __getattr__(name):
+    """uvicorn 多 worker 模式只接受导入字符串：各 worker 通过 benchmark:fake_embed_app 加载使用假 embedding 的 server.app"""
+    if name != "fake_embed_app":
+        raise AttributeError(name)
+    import server
+    use_fake_embeddings(server, int(os.environ["BENCH_FAKE_EMBED_DIM"]))
+    return server.app
+
+# === Fake OpenAI-compatible streaming server ===
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    tokens = 200
+    token_delay = 0.005
+    first_token_delay = 0.05
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        time.sleep(self.first_token_delay)
+        for i in range(self.tokens):
+            chunk = {
+                "id": "bench", "object": "chat.completion.chunk", "created": 0, "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": f"tok{i} "}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            if self.token_delay:
+                time.sleep(self.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+def start_fake_llm(tokens, token_delay, first_token_delay):
+    handler = type("Handler", (FakeLLMHandler,), {
+        "tokens": tokens, "token_delay": token_delay, "first_token_delay": first_token_delay
+    })
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+
+# === Suites ===
+def bench_ingest(server, args, rng):
+    results = []
+    for n_files in args.files:
+        with tempfile.TemporaryDirectory() as root:
+            make_folder(root, n_files, args.words_per_file, rng)
+            server.reset_kb()
+            start = time.perf_counter()
+            server.load_folder(server.FolderRequest(folder_path=root), embed_model=args.embed_model)
+            elapsed = time.perf_counter() - start
+            chunks = sum(s["count"] for s in server.state.sources.values())
+        if chunks == 0:
+            # 文件全部被跳过时吞吐量没有意义
+            raise RuntimeError(f"ingest produced no chunks for {n_files} files")
+        results.append({
+            "files": n_files,
+            "chunks": chunks,
+            "seconds": elapsed,
+            "files_per_s": n_files / elapsed,
+            "chunks_per_s": chunks / elapsed
+        })
+        print(f"[ingest] files={n_files} chunks={chunks} {elapsed:.2f}s", file=sys.stderr)
+    server.reset_kb()
+    return results
+
+def build_index(server, size, args, rng):
+    """直接构造 size 个文本块的索引 (每个文档短于 chunk_size，不会再被切分)"""
+    from langchain_core.documents import Document
+    server.reset_kb()
+    docs = [Document(page_content=random_text(rng, 60), metadata={"source": f"doc_{i}"}) for i in range(size)]
+    vs, texts, ids, err = server.process_docs_to_vs(docs, args.embed_model)
+    if err:
+        raise RuntimeError(err)
+    server.update_knowledge_base(vs, texts, ids, f"bench_{size}", "bench", args.embed_model)
+
+def bench_retrieval(server, args, rng):
+    results = []
+    for size in args.index_sizes:
+        build_index(server, size, args, rng)
+        queries = [random_text(rng, 6) for _ in range(args.queries)]
+        for q in queries[:5]:
+            server.hybrid_search(q)  # 预热
+        samples = []
+        for q in queries:
+            start = time.perf_counter()
+            server.hybrid_search(q, top_k=6, fetch_k=20)
+            samples.append(time.perf_counter() - start)
+        results.append({"index_size": size, "latency_ms": percentiles(samples)})
+        print(f"[retrieval] size={size} p50={results[-1]['latency_ms']['p50']:.2f}ms", file=sys.stderr)
+    server.reset_kb()
+    return results
+
+async def run_chat_client(server, base_url, query, model):
+    req = server.ChatRequest(
+        messages=[{"role": "user", "content": query}],
+        api_key="bench", base_url=base_url, model=model, temperature=0.0, mode="rag"
+    )
+    start = time.perf_counter()
+    resp = await server.chat_endpoint(req)
+    ttft = None
+    tokens = 0
+    async for line in resp.body_iterator:
+        event = json.loads(line)
+        if event["t"] == "error":
+            raise RuntimeError(event["d"])
+        if event["t"] == "content":
+            tokens += 1
+            if ttft is None:
+                ttft = time.perf_counter() - start
+    total = time.perf_counter() - start
+    stream_time = total - (ttft or total)
+    return ttft or total, total, tokens / stream_time if stream_time > 0 else 0.0
+
+def bench_chat(server, args, rng):
+    httpd, base_url = start_fake_llm(args.tokens, args.token_delay_ms / 1000, args.first_token_ms / 1000)
+    results = []
+    try:
+        build_index(server, args.chat_index_size, args, rng)
+        # 预热请求不计时：首个请求会触发 openai 等依赖的导入
+        asyncio.run(run_chat_client(server, base_url, random_text(rng, 6), "fake-model"))
+        for clients in args.clients:
+            async def run_round():
+                return await asyncio.gather(*(
+                    run_chat_client(server, base_url, random_text(rng, 6), "fake-model")
+                    for _ in range(clients)
+                ))
+            samples = []
+            for _ in range(args.chat_rounds):
+                samples.extend(asyncio.run(run_round()))
+            results.append({
+                "clients": clients,
+                "ttft_ms": percentiles([s[0] for s in samples]),
+                "total_ms": percentiles([s[1] for s in samples]),
+                "tokens_per_s": statistics.fmean(s[2] for s in samples)
+            })
+            print(f"[chat] clients={clients} ttft_p50={results[-1]['ttft_ms']['p50']:.1f}ms", file=sys.stderr)
+    finally:
+        httpd.shutdown()
+        server.reset_kb()
+    return results
+
+def bench_fs(server, args, rng):
+    results = []
+    for depth in args.tree_depths:
+        with tempfile.TemporaryDirectory() as root:
+            make_tree(root, depth, args.tree_breadth, args.tree_files, rng)
+            n_files = sum(len(files) for _, _, files in os.walk(root))
+            server.state.project_root = root
+            tree_samples, search_samples = [], []
+            for _ in range(args.fs_repeat):
+                start = time.perf_counter()
+                server.fs_tree()
+                tree_samples.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                # 搜索一个不存在的词，强制遍历所有文件
+                server.fs_search(server.FileSearchRequest(query=uuid.uuid4().hex))
+                search_samples.append(time.perf_counter() - start)
+        results.append({
+            "depth": depth,
+            "files": n_files,
+            "fs_tree_ms": percentiles(tree_samples),
+            "fs_search_ms": percentiles(search_samples)
+        })
+        print(f"[fs] depth={depth} files={n_files}", file=sys.stderr)
+    server.state.project_root = None
+    return results
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_http(url, proc, timeout):
+    """轮询直到 url 返回 200，返回耗时 (秒)；超时或进程退出返回 None"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if proc.poll() is not None:
+            return None
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return time.perf_counter() - start
+        except Exception:
+            pass
+        time.sleep(0.02)
+    return None
+
+def post_json(url, body, timeout=600):
+    req = urllib.request.Request(url, data=json.dumps(body).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+def wait_for_source(base_url, name, checks, timeout):
+    """新导入的源要等各 worker 从磁盘快照重新加载后才可见；连续 checks 次 (每次新连接，落到不同 worker) 都能看到才算就绪"""
+    deadline = time.perf_counter() + timeout
+    seen = 0
+    while seen < checks:
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"source {name} not visible on all workers after {timeout}s")
+        with urllib.request.urlopen(f"{base_url}/api/sources", timeout=5) as resp:
+            source = next((s for s in json.loads(resp.read()) if s["name"] == name), None)
+        seen = seen + 1 if source else 0
+        time.sleep(0.05)
+    return source
+
+async def drive_chat(base_url, llm_url, queries, concurrency):
+    """以固定并发数发送 RAG 聊天请求，返回 (每个请求的耗时, 总耗时)"""
+    import httpx
+    samples = []
+    sem = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def one(query):
+            body = {
+                "messages": [{"role": "user", "content": query}],
+                "api_key": "bench", "base_url": llm_url, "model": "fake-model", "temperature": 0.0, "mode": "rag"
+            }
+            async with sem:
+                start = time.perf_counter()
+                async with client.stream("POST", f"{base_url}/api/chat", json=body) as resp:
+                    resp.raise_for_status()
+                    async for line in resp.aiter_lines():
+                        if line and json.loads(line)["t"] == "error":
+                            raise RuntimeError(json.loads(line)["d"])
+                samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        await asyncio.gather(*(one(q) for q in queries))
+        return samples, time.perf_counter() - start
+
+def bench_workers(server, args, rng):
+    """多 worker (SHARED_KB 共享磁盘快照) 下检索吞吐随 worker 数的变化
+
+    LLM 只返回一个 token，请求耗时主要是查询向量化 + 混合检索；每个 worker 数都重新启动服务并导入同一批文件。
+    """
+    httpd, llm_url = start_fake_llm(1, 0, 0)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            make_folder(folder, args.worker_files, args.words_per_file, rng)
+            queries = [random_text(rng, 6) for _ in range(args.worker_requests)]
+            for workers in args.worker_counts:
+                with tempfile.TemporaryDirectory() as tmp:
+                    env = dict(
+                        os.environ, SHARED_KB="1", WARMUP_ON_STARTUP="0",
+                        KB_STORE_DIR=os.path.join(tmp, "kb_store"), RAG_CACHE_DIR=os.path.join(tmp, "cache"),
+                        PROMETHEUS_MULTIPROC_DIR=os.path.join(tmp, "metrics")
+                    )
+                    os.makedirs(env["PROMETHEUS_MULTIPROC_DIR"])
+                    app = "server:app"
+                    if args.fake_embed:
+                        env["BENCH_FAKE_EMBED_DIM"] = str(args.fake_embed_dim)
+                        app = "benchmark:fake_embed_app"
+                    port = free_port()
+                    base_url = f"http://127.0.0.1:{port}"
+                    proc = subprocess.Popen(
+                        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers)],
+                        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                    )
+                    try:
+                        if wait_for_http(f"{base_url}/health", proc, args.startup_timeout) is None:
+                            raise RuntimeError(f"server with {workers} workers failed to start")
+                        post_json(f"{base_url}/api/load_folder?embed_model={args.embed_model}", {"folder_path": folder})
+                        source = wait_for_source(base_url, os.path.basename(folder), workers * 4, args.startup_timeout)
+                        # 预热不计时：每个 worker 首次检索要导入依赖并加载索引
+                        asyncio.run(drive_chat(base_url, llm_url, queries[:workers * args.worker_clients], args.worker_clients))
+                        samples, elapsed = asyncio.run(drive_chat(base_url, llm_url, queries, args.worker_clients))
+                    finally:
+                        proc.terminate()
+                        proc.wait()
+                entry = {
+                    "workers": workers,
+                    "chunks": source["count"],
+                    "requests": len(samples),
+                    "clients": args.worker_clients,
+                    "qps": len(samples) / elapsed,
+                    "latency_ms": percentiles(samples)
+                }
+                entry["speedup"] = entry["qps"] / results[0]["qps"] if results else 1.0
+                results.append(entry)
+                print(f"[workers] workers={workers} qps={entry['qps']:.1f} speedup={entry['speedup']:.2f}", file=sys.stderr)
+    finally:
+        httpd.shutdown()
+    return results
+
+def import_time_breakdown(top):
+    """用 -X importtime 统计累计耗时最高的模块"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": us / 1000} for us, name in rows[:top]]
+
+def bench_startup(server, args, rng):
+    """冷启动：import server 的耗时 (相对空解释器) 以及启动到 /health 可用的时间"""
+    def timed_run(code):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, check=True, capture_output=True)
+        return time.perf_counter() - start
+
+    baseline = [timed_run("pass") for _ in range(args.startup_repeat)]
+    imports = [timed_run("import server") for _ in range(args.startup_repeat)]
+    import_ms = percentiles([max(0.0, t - statistics.median(baseline)) for t in imports])
+
+    health, ready = [], []
+    for _ in range(args.startup_repeat):
+        port = free_port()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port)],
+            cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            t_health = wait_for_http(f"http://127.0.0.1:{port}/health", proc, args.startup_timeout)
+            t_ready = wait_for_http(f"http://127.0.0.1:{port}/health/ready", proc, args.startup_timeout)
+        finally:
+            proc.terminate()
+            proc.wait()
+        if t_health is not None: health.append(t_health)
+        if t_ready is not None: ready.append(t_ready)
+
+    result = {
+        "import_ms": import_ms,
+        "import_budget_ms": args.import_budget_ms,
+        "within_budget": import_ms["p50"] <= args.import_budget_ms,
+        "time_to_health_ms": percentiles(health),
+        "time_to_ready_ms": percentiles(ready),
+        "slowest_imports": import_time_breakdown(10)
+    }
+    print(f"[startup] import p50={import_ms['p50']:.0f}ms (budget {args.import_budget_ms}ms)", file=sys.stderr)
+    return result
+
+def embed_throughput(model, docs, queries, clients):
+    """文档批量嵌入吞吐，以及多个客户端并发 embed_query 的延迟/QPS"""
+    from concurrent.futures import ThreadPoolExecutor
+    start = time.perf_counter()
+    doc_vectors = model.embed_documents(docs)
+    doc_seconds = time.perf_counter() - start
+    query_vectors = model.embed_documents(queries)
+
+    def timed_query(q):
+        t = time.perf_counter()
+        model.embed_query(q)
+        return time.perf_counter() - t
+
+    concurrent = []
+    for n in clients:
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            start = time.perf_counter()
+            samples = list(pool.map(timed_query, queries))
+            elapsed = time.perf_counter() - start
+        concurrent.append({"clients": n, "qps": len(queries) / elapsed, "latency_ms": percentiles(samples)})
+    throughput = {"docs_per_s": len(docs) / doc_seconds, "query": concurrent}
+    return doc_vectors, query_vectors, throughput
+
+def bench_embed(server, args, rng):
+    """ONNX 后端相对 PyTorch 向量的一致性 (余弦相似度、检索召回) 与吞吐对比"""
+    import numpy as np
+    if args.fake_embed:
+        return {"skipped": "--fake-embed replaces all embedding backends"}
+
+    # 长度参差的文本，体现按长度分桶组批的效果
+    docs = [random_text(rng, rng.randint(10, 400)) for _ in range(args.embed_texts)]
+    queries = [random_text(rng, 6) for _ in range(args.queries)]
+    k = args.recall_k
+
+    results = []
+    reference = None
+    for backend in ["torch"] + [b for b in args.embed_backends.split(",") if b and b != "torch"]:
+        name = server.embedding_model_key(args.embed_model, backend)
+        start = time.perf_counter()
+        model = server.get_embedding_model(name)
+        load_s = time.perf_counter() - start
+        if model is None:
+            raise RuntimeError(f"Failed to load embedding model {name}")
+        model.embed_documents(docs[:8])  # 预热
+        doc_vectors, query_vectors, throughput = embed_throughput(model, docs, queries, args.clients)
+        doc_vectors = np.asarray(doc_vectors, dtype=np.float32)
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        entry = {"backend": backend, "model": name, "load_s": load_s, **throughput}
+
+        top_k = np.argsort(-(query_vectors @ doc_vectors.T), axis=1)[:, :k]
+        if reference is None:
+            reference = (doc_vectors, query_vectors, top_k)
+        else:
+            ref_docs, ref_queries, ref_top_k = reference
+            cosine = np.concatenate([
+                (doc_vectors * ref_docs).sum(axis=1), (query_vectors * ref_queries).sum(axis=1)
+            ])
+            recall = [len(set(a) & set(b)) / k for a, b in zip(top_k, ref_top_k)]
+            entry["agreement"] = {
+                "cosine_mean": float(cosine.mean()),
+                "cosine_min": float(cosine.min()),
+                f"recall_at_{k}": float(np.mean(recall)),
+            }
+        results.append(entry)
+        print(f"[embed] {name} docs/s={entry['docs_per_s']:.1f} agreement={entry.get('agreement')}", file=sys.stderr)
+    return results
+
+SUITES = {
+    "ingest": bench_ingest,
+    "retrieval": bench_retrieval,
+    "chat": bench_chat,
+    "fs": bench_fs,
+    "startup": bench_startup,
+    "embed": bench_embed,
+    "workers": bench_workers,
+}
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+def main():
+    parser = argparse.ArgumentParser(description="DeepSeek RAG backend benchmark")
+    parser.add_argument("--suites", default="ingest,retrieval,chat,fs,startup", help="逗号分隔: " + ",".join(SUITES))
+    parser.add_argument("--output", help="JSON 输出文件 (默认 stdout)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--embed-model", default="bge-small")
+    parser.add_argument("--fake-embed", action="store_true", help="使用确定性哈希向量代替真实 embedding 模型")
+    parser.add_argument("--fake-embed-dim", type=int, default=384)
+    parser.add_argument("--files", type=int_list, default=[100, 1000])
+    parser.add_argument("--words-per-file", type=int, default=400)
+    parser.add_argument("--index-sizes", type=int_list, default=[1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--clients", type=int_list, default=[1, 4, 16])
+    parser.add_argument("--chat-rounds", type=int, default=3)
+    parser.add_argument("--chat-index-size", type=int, default=1000)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--token-delay-ms", type=float, default=5)
+    parser.add_argument("--first-token-ms", type=float, default=50)
+    parser.add_argument("--tree-depths", type=int_list, default=[2, 4])
+    parser.add_argument("--tree-breadth", type=int, default=4)
+    parser.add_argument("--tree-files", type=int, default=5)
+    parser.add_argument("--fs-repeat", type=int, default=20)
+    parser.add_argument("--startup-repeat", type=int, default=5)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--import-budget-ms", type=float, default=1000)
+    parser.add_argument("--fail-over-budget", action="store_true", help="import 耗时超出预算时以非零状态退出")
+    parser.add_argument("--embed-backends", default="onnx,onnx-int8", help="与 torch 对比的 embedding 后端")
+    parser.add_argument("--embed-texts", type=int, default=1000)
+    parser.add_argument("--recall-k", type=int, default=10)
+    parser.add_argument("--worker-counts", type=int_list, default=[1, 4])
+    parser.add_argument("--worker-files", type=int, default=200)
+    parser.add_argument("--worker-requests", type=int, default=400)
+    parser.add_argument("--worker-clients", type=int, default=16)
+    args = parser.parse_args()
+
+    import server
+    if args.fake_embed:
+        use_fake_embeddings(server, args.fake_embed_dim)
+
+    rng = random.Random(args.seed)
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+        "results": {}
+    }
+    for name in args.suites.split(","):
+        report["results"][name] = SUITES[name](server, args, rng)
+
+    out = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(out)
+    else:
+        print(out)
+
+    startup = report["results"].get("startup")
+    if args.fail_over_budget and startup and not startup["within_budget"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
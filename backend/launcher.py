@@ -0,0 +1,31 @@
+"""
+后端启动入口 (Electron 与 npm run dev 均通过 python backend/launcher.py 启动)
+
+uvicorn 以 "server:app" 导入字符串加载应用。主模块是本文件而不是 server.py：
+uvicorn 的 worker 进程、PDF 解析进程池 (spawn / forkserver) 在子进程中会重新执行主模块，
+若主模块是 server.py，子进程会把它作为 __mp_main__ 完整执行一遍，worker 随后再导入 server 时
+Prometheus 指标重复注册而启动失败；PDF 子进程也会白白加载整个后端。
+
+环境变量: WORKERS (worker 进程数，默认 1)、PORT (默认 8000)
+"""
+import os
+import tempfile
+
+HOST = "127.0.0.1"
+
+def main():
+    import uvicorn
+    workers = int(os.environ.get("WORKERS", "1"))
+    port = int(os.environ.get("PORT", "8000"))
+    # === [关键修改] 显式绑定 127.0.0.1 避免 0.0.0.0 被防火墙拦截或 localhost 解析错误 ===
+    print(f"启动后端服务: [http://{HOST}:{port}](http://{HOST}:{port})")
+    if workers > 1:
+        # 多 worker 模式：知识库通过磁盘快照共享，指标通过 prometheus 多进程目录汇总
+        # (环境变量需在 worker 进程导入 server 前设置)
+        os.environ["SHARED_KB"] = "1"
+        if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="rag_metrics_")
+    uvicorn.run("server:app", host=HOST, port=port, workers=workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+ONNX Runtime embedding 后端 (纯 CPU 部署)
+
+- 首次使用时把 HuggingFace 模型导出为 ONNX，可选 int8 动态量化，结果缓存到磁盘后复用
+- 按 token 长度排序分桶组批，每批只 padding 到本批最长序列，并限制单批 token 总量
+- 多个并发调用 (如多个聊天请求的 query embedding、多路导入) 在短时间窗口内合并为一次推理
+
+池化方式和最大长度读取自 sentence-transformers 配置，与 HuggingFaceEmbeddings 的输出保持一致。
+本模块依赖 onnxruntime / tokenizers / numpy，导出时还需要 torch / transformers，int8 量化需要 onnx，由 server.py 按需导入。
+"""
+import os
+import re
+import json
+import time
+import inspect
+import queue
+import shutil
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+META_FILE = "meta.json"
+
+_export_locks = {}
+_export_locks_guard = threading.Lock()
+
+def read_model_json(repo_id, filename):
+    """读取模型目录 (本地路径或 HuggingFace Hub) 中的 JSON 配置，不存在时返回 None"""
+    try:
+        if os.path.isdir(repo_id):
+            path = os.path.join(repo_id, filename)
+        else:
+            from huggingface_hub import hf_hub_download
+            path = hf_hub_download(repo_id, filename)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def read_pooling_config(repo_id):
+    """sentence-transformers 的池化方式与最大序列长度 (缺省为 mean / 512)"""
+    pooling = "mean"
+    pooling_cfg = read_model_json(repo_id, "1_Pooling/config.json") or {}
+    if pooling_cfg.get("pooling_mode_cls_token"):
+        pooling = "cls"
+    st_cfg = read_model_json(repo_id, "sentence_bert_config.json") or {}
+    return pooling, int(st_cfg.get("max_seq_length") or 512)
+
+def onnx_model_dir(cache_dir, repo_id):
+    return os.path.join(cache_dir, re.sub(r"[^\w.-]+", "--", repo_id.strip("/\\")))
+
+def export_onnx(repo_id, model_dir):
+    """用 torch.onnx 导出 fp32 模型和 tokenizer；先写临时目录再整体改名，多进程并发导出也不会读到半成品"""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    print(f"Exporting {repo_id} to ONNX ...")
+    tmp_dir = f"{model_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(repo_id)
+        model = AutoModel.from_pretrained(repo_id).eval()
+        sample = tokenizer(["ONNX export sample 导出示例"], return_tensors="pt")
+        input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+        dynamic_axes = {n: {0: "batch", 1: "sequence"} for n in input_names + ["last_hidden_state"]}
+        # 新版 torch 默认使用 dynamo 导出 (需要 onnxscript，且不支持 dynamic_axes)，固定使用 TorchScript 导出
+        options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+        with torch.no_grad():
+            torch.onnx.export(
+                model, tuple(sample[n] for n in input_names), os.path.join(tmp_dir, MODEL_FILE),
+                input_names=input_names, output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes, opset_version=14, do_constant_folding=True, **options
+            )
+        tokenizer.save_pretrained(tmp_dir)
+        pooling, max_length = read_pooling_config(repo_id)
+        meta = {
+            "repo_id": repo_id,
+            "pooling": pooling,
+            "max_length": min(max_length, tokenizer.model_max_length),
+            "pad_id": tokenizer.pad_token_id or 0,
+        }
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        try:
+            os.replace(tmp_dir, model_dir)
+        except OSError:
+            # 其他进程已先完成导出
+            if not os.path.exists(os.path.join(model_dir, META_FILE)):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def quantize_onnx(src, dst):
+    """int8 动态量化 (权重量化，激活在运行时量化)，适合 CPU 上的 Transformer 推理"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    print(f"Quantizing {src} to int8 ...")
+    tmp = f"{dst[:-len('.onnx')]}.{os.getpid()}.tmp.onnx"
+    try:
+        quantize_dynamic(src, tmp, weight_type=QuantType.QInt8)
+        os.replace(tmp, dst)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def ensure_onnx_model(repo_id, cache_dir, quantize=False):
+    """返回 (模型目录, onnx 文件路径)，缓存中没有时先导出/量化"""
+    model_dir = onnx_model_dir(cache_dir, repo_id)
+    with _export_locks_guard:
+        lock = _export_locks.setdefault(model_dir, threading.Lock())
+    with lock:
+        if not os.path.exists(os.path.join(model_dir, META_FILE)):
+            os.makedirs(cache_dir, exist_ok=True)
+            export_onnx(repo_id, model_dir)
+        path = os.path.join(model_dir, MODEL_FILE)
+        if quantize:
+            quantized = os.path.join(model_dir, QUANTIZED_MODEL_FILE)
+            if not os.path.exists(quantized):
+                quantize_onnx(path, quantized)
+            path = quantized
+    return model_dir, path
+
+class OnnxEmbeddings(Embeddings):
+    """ONNX Runtime 推理的 embedding 模型，所有调用经由同一个批处理线程执行"""
+
+    def __init__(self, repo_id, cache_dir, quantize=False, intra_op_threads=0,
+                 max_batch_size=64, max_batch_tokens=16384, batch_wait_ms=2.0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir, path = ensure_onnx_model(repo_id, cache_dir, quantize)
+        with open(os.path.join(model_dir, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.pooling = meta["pooling"]
+        self.pad_id = meta["pad_id"]
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(meta["max_length"])
+        self.tokenizer.no_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.output_name = self.session.get_outputs()[0].name
+
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.batch_wait = batch_wait_ms / 1000
+        self._queue = queue.Queue()
+        threading.Thread(target=self._batch_loop, name="onnx-embed", daemon=True).start()
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        return self._submit(list(texts))
+
+    def embed_query(self, text):
+        return self._submit([text])[0]
+
+    def _submit(self, texts):
+        future = Future()
+        self._queue.put((texts, future))
+        return future.result()
+
+    def _batch_loop(self):
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            # 等待窗口内合并其他调用方的请求，凑满一批或超时即开始推理
+            deadline = time.monotonic() + self.batch_wait
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            texts = [t for item_texts, _ in pending for t in item_texts]
+            try:
+                vectors = self._infer(self.tokenizer.encode_batch(texts))
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            pos = 0
+            for item_texts, future in pending:
+                future.set_result(vectors[pos:pos + len(item_texts)])
+                pos += len(item_texts)
+
+    def _infer(self, encodings):
+        """按长度升序分桶：每批 padding 后的 token 数不超过 max_batch_tokens，返回与输入同序的向量"""
+        order = sorted(range(len(encodings)), key=lambda i: len(encodings[i].ids))
+        result = [None] * len(encodings)
+        start = 0
+        while start < len(order):
+            end = start + 1
+            # 升序排列，新加入的序列就是本批最长的
+            while (end < len(order) and end - start < self.max_batch_size
+                   and len(encodings[order[end]].ids) * (end - start + 1) <= self.max_batch_tokens):
+                end += 1
+            vectors = self._forward([encodings[i] for i in order[start:end]])
+            for i, vector in zip(order[start:end], vectors):
+                result[i] = vector.tolist()
+            start = end
+        return result
+
+    def _forward(self, batch):
+        seq_len = max(len(e.ids) for e in batch)
+        input_ids = np.full((len(batch), seq_len), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(batch), seq_len), dtype=np.int64)
+        for row, encoding in enumerate(batch):
+            input_ids[row, :len(encoding.ids)] = encoding.ids
+            attention_mask[row, :len(encoding.ids)] = 1
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run([self.output_name], feeds)[0]
+
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask[..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        # 与 normalize_embeddings=True 一致，输出单位向量
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
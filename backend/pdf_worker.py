@@ -0,0 +1,14 @@
+"""
+PDF 解析进程池的任务函数
+
+单独成模块，任务函数不依赖 server.py 的全局状态；forkserver 预加载本模块。
+spawn / forkserver 的子进程还会重新执行主模块，因此后端由轻量的 launcher.py 作为主模块启动：
+子进程只加载 launcher 与本模块 (首个任务约 0.14s)；若以 server.py 为主模块，每个子进程都会
+完整执行一遍 server.py (FastAPI、指标、全局状态，首个任务约 0.6s)。
+"""
+
+def extract_pdf_pages(path, start, end):
+    """在子进程中提取 [start, end) 页的文本"""
+    import fitz
+    with fitz.open(path) as pdf:
+        return [(i, pdf[i].get_text()) for i in range(start, end)]
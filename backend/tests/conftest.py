@@ -0,0 +1,30 @@
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# server 在导入时读取配置：测试使用临时目录，不在启动时预热
+_tmp = tempfile.mkdtemp(prefix="rag_test_")
+os.environ.setdefault("RAG_CACHE_DIR", os.path.join(_tmp, "cache"))
+os.environ.setdefault("KB_STORE_DIR", os.path.join(_tmp, "kb_store"))
+os.environ.setdefault("PROFILE_DIR", os.path.join(_tmp, "profiles"))
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+import pytest
+
+@pytest.fixture
+def server(monkeypatch):
+    """使用确定性哈希向量代替真实 embedding 模型，测试前后清空知识库"""
+    import server
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    monkeypatch.setattr(server, "get_embedding_model", lambda model_name: DeterministicFakeEmbedding(size=16))
+    server.reset_kb()
+    yield server
+    server.reset_kb()
+
+def indexed_ids_match(kb):
+    """索引中的向量数与各源记录的 doc_ids 总数一致"""
+    total = kb.vector_store.index.ntotal if kb.vector_store else 0
+    return total == sum(s["count"] for s in kb.sources.values())
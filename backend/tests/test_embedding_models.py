@@ -0,0 +1,38 @@
+import sys
+import types
+import threading
+
+def test_slow_model_build_does_not_block_other_models(monkeypatch):
+    import server
+    monkeypatch.setattr(server, "_embedding_models", {})
+    monkeypatch.setattr(server, "_embedding_model_locks", {})
+    release = threading.Event()
+    started = threading.Event()
+    builds = []
+
+    class FakeOnnxEmbeddings:
+        def __init__(self, repo_id, *args, **kwargs):
+            builds.append(repo_id)
+            if repo_id == "slow":
+                # 模拟耗时的 ONNX 导出
+                started.set()
+                assert release.wait(10)
+
+    monkeypatch.setitem(sys.modules, "onnx_embeddings", types.SimpleNamespace(OnnxEmbeddings=FakeOnnxEmbeddings))
+    results = []
+    loaders = [threading.Thread(target=lambda: results.append(server.get_embedding_model("slow@onnx"))) for _ in range(2)]
+    for t in loaders:
+        t.start()
+    assert started.wait(10)
+
+    # 慢模型构建期间其他模型照常加载
+    fast = server.get_embedding_model("fast@onnx")
+    assert fast is server.get_embedding_model("fast@onnx")
+    assert not results
+
+    release.set()
+    for t in loaders:
+        t.join(10)
+    # 同一模型只构建一次，等待的请求拿到同一实例
+    assert len(results) == 2 and results[0] is results[1]
+    assert sorted(builds) == ["fast", "slow"]
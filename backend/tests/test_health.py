@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+
+def test_lifespan_runs_warm_up_and_ready_reflects_failure(server, monkeypatch):
+    monkeypatch.setattr(server, "WARMUP_ON_STARTUP", True)
+    monkeypatch.setattr(server, "SUBSYSTEM_MODULES", {"broken": "module_that_does_not_exist"})
+    monkeypatch.setattr(server, "warmup_status", dict(server.warmup_status, status="idle"))
+    with TestClient(server.app) as client:
+        # 预热在后台线程中进行，等待其结束
+        for _ in range(100):
+            resp = client.get("/health/ready")
+            if resp.json()["status"] != "warming":
+                break
+            server.time.sleep(0.05)
+        assert resp.status_code == 503
+        assert resp.json()["status"] == "failed"
+        assert "module_that_does_not_exist" in resp.json()["warmup"]["error"]
+        assert client.get("/health/live").status_code == 200
+
+def test_ready_without_warm_up(server, monkeypatch):
+    monkeypatch.setattr(server, "warmup_status", dict(server.warmup_status, status="idle"))
+    with TestClient(server.app) as client:
+        resp = client.get("/health/ready")
+    assert (resp.status_code, resp.json()["status"]) == (200, "ready")
@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+import urllib.request
+
+from conftest import BACKEND_DIR
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def test_server_py_starts_multiple_workers(tmp_path):
+    """WORKERS=2 python server.py：两个 worker 都能正常启动并处理请求，不会因指标重复注册反复崩溃重启"""
+    port = free_port()
+    env = dict(
+        os.environ, WORKERS="2", PORT=str(port), WARMUP_ON_STARTUP="0",
+        KB_STORE_DIR=str(tmp_path / "kb_store"), PROMETHEUS_MULTIPROC_DIR=str(tmp_path / "metrics")
+    )
+    os.makedirs(env["PROMETHEUS_MULTIPROC_DIR"])
+    proc = subprocess.Popen(
+        [sys.executable, "server.py"], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        deadline = time.time() + 60
+        while True:
+            assert proc.poll() is None, "launcher exited"
+            assert time.time() < deadline, "server did not become healthy"
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1):
+                    break
+            except OSError:
+                time.sleep(0.2)
+        # 每次新建连接，请求会分散到两个 worker
+        for _ in range(20):
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/sources", timeout=5) as resp:
+                assert json.loads(resp.read()) == []
+        time.sleep(1)
+        assert proc.poll() is None
+    finally:
+        proc.terminate()
+        output = proc.communicate(timeout=30)[0]
+    assert "DuplicatedTimeseries" not in output
+    assert output.count("Started server process") == 2
@@ -0,0 +1,53 @@
+from opentelemetry import trace as otel_trace
+from opentelemetry.trace import NonRecordingSpan, SpanContext
+
+class RecordingTracer:
+    """只安装了 OTel API 时的替身：记录每个 span 的名称、父 span 和结束状态"""
+    def __init__(self):
+        self.spans = []
+        self.next_id = 1
+
+    def start_span(self, name, context=None, start_time=None, attributes=None):
+        parent = otel_trace.get_current_span(context).get_span_context()
+        trace_id = parent.trace_id if parent.is_valid else 0xabc
+        span = RecordedSpan(SpanContext(trace_id, self.next_id, is_remote=False))
+        self.next_id += 1
+        span.name, span.parent = name, parent
+        self.spans.append(span)
+        return span
+
+class RecordedSpan(NonRecordingSpan):
+    ended = False
+    status_code = None
+
+    def set_attribute(self, key, value):
+        if key == "http.status_code":
+            self.status_code = value
+
+    def end(self, end_time=None):
+        self.ended = True
+
+def test_stage_spans_are_children_of_request_span(server, monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    tracer = RecordingTracer()
+    monkeypatch.setattr(server, "otel_tracer", tracer)
+    (tmp_path / "notes.md").write_text("some notes\n")
+    trace_ids = []
+    record_stage = server.record_stage
+    def spy(stage, seconds, error=False):
+        trace_ids.append(server.current_trace.get().trace_id)
+        record_stage(stage, seconds, error)
+    monkeypatch.setattr(server, "record_stage", spy)
+
+    with TestClient(server.app) as client:
+        resp = client.post("/api/load_folder", json={"folder_path": str(tmp_path)})
+    assert resp.status_code == 200
+    request_span, *stages = tracer.spans
+    assert request_span.name == "POST /api/load_folder"
+    assert request_span.ended and request_span.status_code == 200
+    assert {s.name for s in stages} >= {"load", "merge"}
+    request_context = request_span.get_span_context()
+    assert all(s.parent.span_id == request_context.span_id for s in stages)
+    assert all(s.get_span_context().trace_id == request_context.trace_id for s in stages)
+    # 请求内记录的 trace_id 与 OTel trace 一致
+    assert set(trace_ids) == {otel_trace.format_trace_id(request_context.trace_id)}
@@ -0,0 +1,157 @@
+import os
+import re
+import sys
+import asyncio
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+FAKE_FFMPEG = """#!{python}
+import os, sys, time
+out = sys.argv[-1]
+if "-c" in sys.argv:
+    # 切分片段
+    time.sleep(float(os.environ.get("FAKE_SEG_SLEEP", "0")))
+    open(out, "wb").write(b"x" * 1000)
+else:
+    # 抽取音轨
+    open(out, "wb").write(b"x" * int(os.environ["FAKE_AUDIO_BYTES"]))
+"""
+
+FAKE_FFPROBE = """#!{python}
+import os
+print(os.environ["FAKE_DURATION"])
+"""
+
+class TranscriptionHandler(BaseHTTPRequestHandler):
+    """OpenAI 兼容的转录接口：返回一条 60s-62s 的字幕，内容为上传的文件名"""
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        filename = re.search(rb'filename="([^"]+)"', body).group(1).decode()
+        self.requests.append(filename)
+        srt = f"1\n00:01:00,000 --> 00:01:02,000\n{filename}\n".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(srt)))
+        self.end_headers()
+        self.wfile.write(srt)
+
+@pytest.fixture
+def client():
+    from openai import AsyncOpenAI
+    handler = type("Handler", (TranscriptionHandler,), {"requests": []})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield AsyncOpenAI(api_key="test", base_url=f"http://127.0.0.1:{httpd.server_address[1]}/v1"), handler.requests
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def media(tmp_path, monkeypatch):
+    """假的 ffmpeg / ffprobe，临时目录改到 tmp_path 下以检查清理情况"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name, script in (("ffmpeg", FAKE_FFMPEG), ("ffprobe", FAKE_FFPROBE)):
+        path = bin_dir / name
+        path.write_text(script.format(python=sys.executable))
+        path.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    work_root = tmp_path / "tmp"
+    work_root.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(work_root))
+    src = tmp_path / "video.mp4"
+    src.write_bytes(b"video")
+    return str(src), work_root
+
+def transcribe(server, path, client):
+    async def run():
+        return [event async for event in server.transcribe_media(path, client, "whisper-1")]
+    return asyncio.run(run())
+
+def test_stitch_srt_offsets_and_drops_overlap_duplicates(server):
+    # 第二段从 595s 开始，与第一段重叠 5s，以 597.5s 为界取舍
+    first = ("1\n00:00:01,000 --> 00:00:02,000\nhello\n\n"
+             "2\n00:09:57,000 --> 00:09:58,000\nshared line\n\n"
+             "3\n00:09:58,000 --> 00:09:59,000\ntail from first\n")
+    second = ("1\n00:00:01,000 --> 00:00:02,000\nhead from second\n\n"
+              "2\n00:00:02,500 --> 00:00:03,500\nshared line\n\n"
+              "3\n00:00:10,000 --> 00:00:11,000\nworld\n")
+    cues = server.parse_srt(server.stitch_srt([(0, first), (595, second)], 5))
+    assert cues == [(1.0, 2.0, "hello"), (597.0, 598.5, "shared line"), (605.0, 606.0, "world")]
+
+def test_short_media_is_sent_whole_as_extracted_audio(server, media, client, monkeypatch):
+    path, _ = media
+    api, requests = client
+    monkeypatch.setenv("FAKE_DURATION", "100")
+    monkeypatch.setenv("FAKE_AUDIO_BYTES", "1000")
+    events = transcribe(server, path, api)
+    assert requests == ["audio.mp3"]
+    assert events[-1] == ("content", "1\n00:01:00,000 --> 00:01:02,000\naudio.mp3\n")
+
+def test_long_media_is_split_and_stitched(server, media, client, monkeypatch):
+    path, work_root = media
+    api, requests = client
+    monkeypatch.setattr(server, "TRANSCRIBE_SEGMENT_SECONDS", 600)
+    monkeypatch.setattr(server, "TRANSCRIBE_OVERLAP_SECONDS", 5)
+    monkeypatch.setenv("FAKE_DURATION", "1500")
+    monkeypatch.setenv("FAKE_AUDIO_BYTES", "1000")
+    events = transcribe(server, path, api)
+    assert sorted(requests) == ["seg_0000.mp3", "seg_0001.mp3", "seg_0002.mp3"]
+    # 片段起点 0 / 595 / 1190 秒，字幕按偏移拼接
+    assert [c[:2] for c in server.parse_srt(events[-1][1])] == [(60.0, 62.0), (655.0, 657.0), (1250.0, 1252.0)]
+    assert events[-2] == ("progress", {"done": 3, "total": 3})
+    assert list(work_root.iterdir()) == []
+
+def test_large_audio_is_split_by_size(server, media, client, monkeypatch):
+    path, _ = media
+    api, requests = client
+    monkeypatch.setattr(server, "TRANSCRIBE_SEGMENT_SECONDS", 600)
+    monkeypatch.setattr(server, "TRANSCRIBE_MAX_BYTES", 24 * 1024 * 1024)
+    # 9 分钟但音轨 30MB：时长未超限，按体积切成两段
+    monkeypatch.setenv("FAKE_DURATION", "540")
+    monkeypatch.setenv("FAKE_AUDIO_BYTES", str(30 * 1024 * 1024))
+    transcribe(server, path, api)
+    assert sorted(requests) == ["seg_0000.mp3", "seg_0001.mp3"]
+
+def test_closing_the_stream_kills_ffmpeg_and_removes_work_dir(server, media, client, monkeypatch):
+    path, work_root = media
+    api, requests = client
+    monkeypatch.setenv("FAKE_DURATION", "3600")
+    monkeypatch.setenv("FAKE_AUDIO_BYTES", "1000")
+    monkeypatch.setenv("FAKE_SEG_SLEEP", "30")
+
+    async def run():
+        events = server.transcribe_media(path, api, "whisper-1")
+        assert (await events.__anext__())[0] == "progress"
+        pending = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0.5)
+        pending.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        await events.aclose()
+
+    asyncio.run(run())
+    assert requests == []
+    assert list(work_root.iterdir()) == []
+    ps = subprocess.run(["ps", "-eo", "args"], capture_output=True, text=True).stdout
+    assert str(work_root) not in ps
+
+def test_without_ffmpeg_large_files_are_rejected(server, tmp_path, client, monkeypatch):
+    api, requests = client
+    monkeypatch.setattr(server.shutil, "which", lambda name: None)
+    monkeypatch.setattr(server, "TRANSCRIBE_MAX_BYTES", 10)
+    small, large = tmp_path / "small.mp3", tmp_path / "large.mp3"
+    small.write_bytes(b"x" * 10)
+    large.write_bytes(b"x" * 11)
+    assert transcribe(server, str(small), api)[-1][0] == "content"
+    with pytest.raises(RuntimeError):
+        transcribe(server, str(large), api)
+    assert requests == ["small.mp3"]
@@ -0,0 +1,107 @@
+import os
+import time
+import asyncio
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+from conftest import indexed_ids_match
+
+class SiteHandler(SimpleHTTPRequestHandler):
+    redirects = {}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path in self.redirects:
+            self.send_response(302)
+            self.send_header("Location", self.redirects[self.path])
+            self.end_headers()
+            return
+        super().do_GET()
+
+def write_page(path, body):
+    previous = path.stat().st_mtime if path.exists() else 0
+    path.write_text(f"<html><title>{path.name}</title><body>{body}</body></html>", encoding="utf-8")
+    # If-Modified-Since 精度为秒，手动推进修改时间保证条件请求能识别变化
+    mtime = max(previous, time.time()) + 10
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def site(tmp_path, server, monkeypatch):
+    monkeypatch.setattr(server, "WEB_CACHE_DIR", str(tmp_path / "web_cache"))
+    root = tmp_path / "site"
+    (root / "docs").mkdir(parents=True)
+    handler = type("Handler", (SiteHandler,), {"redirects": {}})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(handler, directory=str(root)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield root, f"http://127.0.0.1:{httpd.server_address[1]}", handler.redirects
+    httpd.shutdown()
+    httpd.server_close()
+
+def crawl(server, url, **kwargs):
+    return asyncio.run(server.crawl_web(server.WebRequest(url=url, crawl=True, **kwargs), "fake"))
+
+def test_crawl_then_conditional_recrawl(server, site):
+    root, base, _ = site
+    write_page(root / "docs" / "index.html", 'home <a href="a.html">a</a> <a href="b.html">b</a>')
+    write_page(root / "docs" / "a.html", "page alpha")
+    write_page(root / "docs" / "b.html", "page beta old")
+
+    # /docs 会被重定向到 /docs/，相对链接需基于最终地址解析
+    result = crawl(server, f"{base}/docs")
+    assert (result["count"], result["changed"], result["downloaded"]) == (3, 3, 3)
+    source = server.find_source(f"{base}/docs", "web")
+    assert sorted(source["pages"]) == [f"{base}/docs/", f"{base}/docs/a.html", f"{base}/docs/b.html"]
+
+    # 未变化的页面全部命中条件请求 (304)，不重新向量化
+    result = crawl(server, f"{base}/docs")
+    assert (result["count"], result["changed"], result["downloaded"]) == (3, 0, 0)
+
+    write_page(root / "docs" / "b.html", "page beta new")
+    result = crawl(server, f"{base}/docs")
+    assert (result["changed"], result["downloaded"]) == (1, 1)
+    kb = server.state.kb
+    assert "page beta new" in kb.full_text and "page beta old" not in kb.full_text
+    assert indexed_ids_match(kb)
+
+def test_deleted_page_is_removed_and_failed_page_kept(server, site):
+    root, base, _ = site
+    write_page(root / "docs" / "index.html", 'home <a href="a.html">a</a> <a href="b.html">b</a>')
+    write_page(root / "docs" / "a.html", "page alpha")
+    write_page(root / "docs" / "b.html", "page beta")
+    crawl(server, f"{base}/docs/")
+
+    (root / "docs" / "a.html").unlink()
+    write_page(root / "docs" / "index.html", "home without links")
+    crawl(server, f"{base}/docs/")
+    source = server.find_source(f"{base}/docs/", "web")
+    assert sorted(source["pages"]) == [f"{base}/docs/", f"{base}/docs/b.html"]
+    assert "page alpha" not in server.state.kb.full_text
+    assert indexed_ids_match(server.state.kb)
+
+def test_cross_host_redirect_is_not_followed_into_index(server, site):
+    root, base, redirects = site
+    port = base.rsplit(":", 1)[1]
+    redirects["/docs/out"] = f"http://localhost:{port}/docs/a.html"
+    write_page(root / "docs" / "index.html", 'home <a href="out">out</a>')
+    write_page(root / "docs" / "a.html", "page alpha")
+
+    result = crawl(server, f"{base}/docs/")
+    assert result["count"] == 1
+    assert "page alpha" not in server.state.kb.full_text
+
+def test_unreachable_seed_keeps_existing_source(server, site):
+    root, base, _ = site
+    write_page(root / "docs" / "index.html", "home")
+    crawl(server, f"{base}/docs/")
+    version = server.state.kb.version
+
+    (root / "docs" / "index.html").unlink()
+    with pytest.raises(server.HTTPException) as exc:
+        crawl(server, f"{base}/docs/index.html")
+    assert exc.value.status_code == 502
+    assert server.state.kb.version == version
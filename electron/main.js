@@ -39,7 +39,7 @@ function createWindow() {
 }
 
 function startPythonBackend() {
-  const scriptPath = path.join(__dirname, '../backend/server.py');
+  const scriptPath = path.join(__dirname, '../backend/launcher.py');
   
   console.log("Starting Python backend from:", scriptPath);
   
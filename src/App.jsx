@@ -417,11 +417,11 @@ const App = () => {
 
   // === 展开代码块，确保可读性 ===
   const handleFileUpload = async (e) => {
-    const file = e.target.files[0]; 
-    if (!file) return;
+    const files = Array.from(e.target.files || []); 
+    if (!files.length) return;
     setIsImporting(true);
     const formData = new FormData(); 
-    formData.append("file", file); 
+    files.forEach(f => formData.append("files", f)); 
     formData.append("mode", ragMode); 
     formData.append("embed_model", embedModel);
     try { 
@@ -758,8 +758,26 @@ const App = () => {
             fd.append("file", toolFile); 
             fd.append("api_key", apiKey); 
             fd.append("base_url", baseUrl);
-            response = await axios.post(`${API_URL}/api/tool/video_subtitle`, fd, { headers: { 'Content-Type': 'multipart/form-data' } });
-            setToolOutput(response.data.content);
+            fd.append("stream", "true");
+            response = await fetch(`${API_URL}/api/tool/video_subtitle`, { method: "POST", body: fd });
+            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let textBuffer = "";
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                textBuffer += decoder.decode(value, { stream: true });
+                const lines = textBuffer.split("\n");
+                textBuffer = lines.pop();
+                for (let line of lines) {
+                    if (!line.trim()) continue;
+                    const data = JSON.parse(line);
+                    if (data.t === "progress") setToolOutput(`转录中... ${data.d.done}/${data.d.total}`);
+                    else if (data.t === "content") setToolOutput(data.d);
+                    else if (data.t === "error") throw new Error(data.d);
+                }
+            }
             isStreamingRef.current = false;
         } else {
             let systemInstruction = activeTool.prompt;
@@ -74,7 +74,7 @@ const ImportModal = ({
                     <div className="min-h-[100px]">
                         {importTab === 'file' && (
                             <div onClick={() => !isImporting && fileInputRef.current.click()} className={`border-2 border-dashed border-slate-300 dark:border-slate-600 rounded-2xl h-32 flex flex-col items-center justify-center cursor-pointer transition group ${isImporting ? 'bg-slate-100 dark:bg-slate-900 opacity-70 cursor-wait' : 'hover:border-indigo-500 hover:bg-indigo-50/50 dark:hover:bg-slate-700'}`}>
-                                <input type="file" ref={fileInputRef} className="hidden" onChange={handleFileUpload} disabled={isImporting} />
+                                <input type="file" multiple ref={fileInputRef} className="hidden" onChange={handleFileUpload} disabled={isImporting} />
                                 {isImporting ? <div className="w-8 h-8 border-4 border-indigo-300 border-t-indigo-600 rounded-full animate-spin mb-3"></div> : <CloudArrowUpIcon className="w-10 h-10 text-slate-400 group-hover:text-indigo-500 transition mb-3"/>}
                                 <p className="text-sm text-slate-500 font-medium">{isImporting ? '正在处理文件...' : '点击上传 PDF, Markdown, Code'}</p>
                             </div>